@@ -7,6 +7,7 @@ import shlex
 import sys
 from typing import Any, Dict, List, Optional, Tuple
 
+from mcp import types
 from mcp.client.session import ClientSession
 from mcp.client.stdio import StdioServerParameters, stdio_client
 import httpx
@@ -28,9 +29,20 @@ KNOWN_COMMANDS = {
     "start",
     "close",
     "switch",
+    "multi",
+    "trace",
+    "tracesum",
+    "snap",
 }
 
 
+def _target_args(target: str) -> Dict[str, str]:
+    # "@e3" refers to a snapshot ref, anything else is a selector.
+    if target.startswith("@"):
+        return {"ref": target[1:]}
+    return {"selector": target}
+
+
 def parse_command(line: str) -> Tuple[Optional[str], Dict[str, Any]]:
     parts = shlex.split(line)
     if not parts:
@@ -45,11 +57,11 @@ def parse_command(line: str) -> Tuple[Optional[str], Dict[str, Any]]:
     if cmd == "open" and args:
         return "open_url", {"url": args[0]}
     if cmd == "click" and args:
-        return "click", {"selector": args[0]}
+        return "click", _target_args(args[0])
     if cmd == "fill" and len(args) >= 2:
-        return "fill", {"selector": args[0], "text": " ".join(args[1:])}
+        return "fill", {**_target_args(args[0]), "text": " ".join(args[1:])}
     if cmd == "press" and len(args) >= 2:
-        return "press", {"selector": args[0], "key": args[1]}
+        return "press", {**_target_args(args[0]), "key": args[1]}
     if cmd == "wait" and args:
         return "wait", {"ms": int(args[0])}
     if cmd == "scroll" and args:
@@ -72,6 +84,19 @@ def parse_command(line: str) -> Tuple[Optional[str], Dict[str, Any]]:
         return "close_browser", {}
     if cmd == "switch":
         return "switch_latest_page", {}
+    if cmd == "multi" and args:
+        return "search_all_sites", {"query": " ".join(args)}
+    if cmd == "trace":
+        if args and args[0].lower() == "chrome":
+            return "trace_next_call", {"path": args[1]} if len(args) > 1 else {}
+        enabled = not (args and args[0].lower() == "off")
+        return "set_tracing", {"enabled": enabled}
+    if cmd == "snap":
+        max_items = int(args[0]) if args else 200
+        return "snapshot", {"max_items": max_items}
+    if cmd == "tracesum":
+        top = int(args[0]) if args else 10
+        return "trace_summary", {"top": top}
 
     return None, {}
 
@@ -112,15 +137,20 @@ def _format_tools_for_prompt() -> str:
         [
             "- start_browser(headless: bool)",
             "- open_url(url: str)",
-            "- click(selector: str)",
-            "- fill(selector: str, text: str)",
-            "- press(selector: str, key: str)",
+            "- snapshot(max_items: int)",
+            "- click(selector: str) or click(ref: str)",
+            "- fill(selector: str, text: str) or fill(ref: str, text: str)",
+            "- press(selector: str, key: str) or press(ref: str, key: str)",
             "- wait(ms: int)",
             "- scroll(delta_y: int)",
             "- humanize(steps: int, min_wait_ms: int, max_wait_ms: int, max_scroll: int)",
             "- get_text(max_chars: int)",
             "- get_visible_buttons(max_items: int)",
             "- screenshot(path: str, full_page: bool)",
+            "- search_all_sites(query: str, sites: str, timeout_ms: int, max_items: int)",
+            "- set_tracing(enabled: bool, path: str)",
+            "- trace_next_call(path: str)",
+            "- trace_summary(path: str, top: int)",
             "- switch_latest_page()",
             "- close_browser()",
         ]
@@ -223,6 +253,18 @@ def rule_based_commands(user_text: str) -> List[Tuple[str, Dict[str, Any]]]:
             ("click", {"selector": cs["login_button"]}),
         ]
 
+    # Both sites named: "쿠팡이랑 네이버에서 생수 검색해줘"
+    if "쿠팡" in text and "네이버" in text and "검색" in text:
+        # Drop the site names with their attached particles, wherever the query sits.
+        rest = re.sub(r"(?:쿠팡|네이버)(?:\s*쇼핑)?(?:이랑|랑|하고|와|과|에서|에)?,?", " ", text)
+        m = re.search(r"(.+?)\s*검색", rest)
+        query = " ".join(m.group(1).split()) if m else ""
+        if query:
+            return [
+                ("start_browser", {"headless": False}),
+                ("search_all_sites", {"query": query}),
+            ]
+
     if "쿠팡" in text and "검색" in text:
         m = re.search(r"쿠팡(?:에|에서)?\\s*(.+?)\\s*검색", text)
         query = m.group(1) if m else text.replace("쿠팡", "").replace("검색", "").strip()
@@ -280,9 +322,10 @@ def print_help() -> None:
     print("Commands:")
     print("  start [headless]")
     print("  open <url>")
-    print("  click <selector>")
-    print("  fill <selector> <text>")
-    print("  press <selector> <key>")
+    print("  snap [max_items]")
+    print("  click <selector|@ref>")
+    print("  fill <selector|@ref> <text>")
+    print("  press <selector|@ref> <key>")
     print("  wait <ms>")
     print("  scroll <pixels>")
     print("  humanize [steps]")
@@ -290,10 +333,23 @@ def print_help() -> None:
     print("  buttons [max_items]")
     print("  shot <path>")
     print("  switch")
+    print("  multi <query>")
+    print("  trace [on|off|chrome [path]]")
+    print("  tracesum [top]")
     print("  close")
     print("  exit | quit")
 
 
+async def print_log_message(params: types.LoggingMessageNotificationParams) -> None:
+    # Partial results from long tools (e.g. search_all_sites) arrive as log messages.
+    print(params.data, flush=True)
+
+
+async def print_progress(progress: float, total: Optional[float], message: Optional[str]) -> None:
+    done = f"{progress:g}/{total:g}" if total else f"{progress:g}"
+    print(f"progress {done} {message or ''}".rstrip(), flush=True)
+
+
 async def main() -> None:
     load_dotenv()
     print("Starting MCP server...", flush=True)
@@ -309,6 +365,7 @@ async def main() -> None:
                 read,
                 write,
                 read_timeout_seconds=datetime.timedelta(seconds=60),
+                logging_callback=print_log_message,
             ) as session:
                 try:
                     await session.initialize()
@@ -344,7 +401,9 @@ async def main() -> None:
 
                     for tool_name, arguments in tool_calls:
                         try:
-                            result = await session.call_tool(tool_name, arguments)
+                            result = await session.call_tool(
+                                tool_name, arguments, progress_callback=print_progress
+                            )
                         except Exception as exc:
                             print(f"error: {exc}")
                             break
@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, CDPSession, Page
+
+
+# Installed on every document while tracing is on: keeps long tasks and lets
+# the resource buffer grow past the default 250 entries.
+LONG_TASK_INIT_SCRIPT = """
+  (() => {
+    if (window.__mcpLongTasks) return;
+    window.__mcpLongTasks = [];
+    try {
+      performance.setResourceTimingBufferSize(2000);
+      new PerformanceObserver((list) => {
+        for (const entry of list.getEntries()) {
+          window.__mcpLongTasks.push([entry.startTime, entry.duration]);
+        }
+      }).observe({ type: "longtask", buffered: true });
+    } catch (e) {}
+  })();
+"""
+
+MARK_SCRIPT = "() => [performance.timeOrigin, performance.now()]"
+
+COLLECT_SCRIPT = """
+  ([sameDocument, since]) => {
+    const round = (v) => Math.round(v);
+    const out = { timeOrigin: performance.timeOrigin };
+    const nav = performance.getEntriesByType("navigation")[0];
+    if (nav && !sameDocument) {
+      out.nav = {
+        type: nav.type,
+        ttfb: round(nav.responseStart - nav.startTime),
+        dcl: round(nav.domContentLoadedEventEnd - nav.startTime),
+        load: nav.loadEventEnd ? round(nav.loadEventEnd - nav.startTime) : null,
+        bytes: nav.transferSize,
+      };
+    }
+    const start = sameDocument ? since : 0;
+    const res = performance.getEntriesByType("resource").filter((e) => e.startTime >= start);
+    const slowest = res
+      .slice()
+      .sort((a, b) => b.duration - a.duration)
+      .slice(0, 3)
+      .map((e) => [e.name.slice(0, 120), round(e.duration)]);
+    out.res = {
+      count: res.length,
+      bytes: res.reduce((sum, e) => sum + (e.transferSize || 0), 0),
+      slowest,
+    };
+    const tasks = (window.__mcpLongTasks || []).filter((t) => t[0] >= start);
+    out.longtasks = {
+      count: tasks.length,
+      total: round(tasks.reduce((sum, t) => sum + t[1], 0)),
+      max: round(tasks.reduce((m, t) => Math.max(m, t[1]), 0)),
+    };
+    return out;
+  }
+"""
+
+# Cumulative CDP metrics reported as deltas (seconds -> ms for durations).
+DURATION_METRICS = ("TaskDuration", "ScriptDuration", "LayoutDuration", "RecalcStyleDuration")
+COUNTER_METRICS = ("LayoutCount", "RecalcStyleCount")
+GAUGE_METRICS = ("JSHeapUsedSize", "Nodes")
+
+
+def cdp_metrics(before: Dict[str, float], after: Dict[str, float]) -> Dict[str, Any]:
+    """
+    Per-call CDP metrics. Counters survive same-process navigations, so the delta is
+    kept unless a counter went backwards (new renderer); then absolute values are used.
+    """
+    cumulative = DURATION_METRICS + COUNTER_METRICS
+    if not before or any(after.get(name, 0) < before.get(name, 0) for name in cumulative):
+        before = {}
+    cdp: Dict[str, Any] = {"scope": "call" if before else "absolute"}
+    for name in DURATION_METRICS:
+        cdp[name] = round((after.get(name, 0.0) - before.get(name, 0.0)) * 1000)
+    for name in COUNTER_METRICS:
+        cdp[name] = int(after.get(name, 0) - before.get(name, 0))
+    for name in GAUGE_METRICS:
+        cdp[name] = int(after.get(name, 0))
+    return cdp
+
+
+class PerfTracer:
+    def __init__(self) -> None:
+        self.enabled = False
+        self.out_path = Path("perf_trace.jsonl")
+        self.chrome_trace_path: Optional[str] = None
+        self._sessions: Dict[Page, CDPSession] = {}
+        self._init_script_contexts: set = set()
+
+    async def _session(self, page: Page) -> Optional[CDPSession]:
+        if page in self._sessions:
+            return self._sessions[page]
+        try:
+            session = await page.context.new_cdp_session(page)
+            await session.send("Performance.enable")
+        except Exception:
+            return None
+        self._sessions[page] = session
+        page.on("close", lambda _: self._sessions.pop(page, None))
+        return session
+
+    async def _metrics(self, page: Page) -> Dict[str, float]:
+        session = await self._session(page)
+        if session is None:
+            return {}
+        try:
+            data = await session.send("Performance.getMetrics")
+        except Exception:
+            return {}
+        return {m["name"]: m["value"] for m in data.get("metrics", [])}
+
+    async def detach(self) -> None:
+        """
+        Stop CDP metric collection on every page that was traced.
+        """
+        sessions, self._sessions = list(self._sessions.values()), {}
+        for session in sessions:
+            try:
+                await session.send("Performance.disable")
+                await session.detach()
+            except Exception:
+                pass
+
+    async def install(self, page: Page) -> None:
+        """
+        Make sure the long-task observer runs on this page and its future documents.
+        """
+        try:
+            if page.context not in self._init_script_contexts:
+                await page.context.add_init_script(LONG_TASK_INIT_SCRIPT)
+                self._init_script_contexts.add(page.context)
+            await page.evaluate(LONG_TASK_INIT_SCRIPT)
+        except Exception:
+            pass
+
+    async def before(self, page: Optional[Page]) -> Dict[str, Any]:
+        if page is None:
+            return {}
+        await self.install(page)
+        snapshot: Dict[str, Any] = {"metrics": await self._metrics(page)}
+        try:
+            snapshot["origin"], snapshot["now"] = await page.evaluate(MARK_SCRIPT)
+        except Exception:
+            pass
+        return snapshot
+
+    async def after(self, page: Optional[Page], snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        if page is None:
+            return {}
+        await self.install(page)
+        record: Dict[str, Any] = {"url": page.url}
+        try:
+            origin, _ = await page.evaluate(MARK_SCRIPT)
+            same_document = origin == snapshot.get("origin")
+            page_data = await page.evaluate(COLLECT_SCRIPT, [same_document, snapshot.get("now", 0)])
+            page_data.pop("timeOrigin", None)
+            record.update(page_data)
+        except Exception:
+            pass
+
+        after = await self._metrics(page)
+        if after:
+            record["cdp"] = cdp_metrics(snapshot.get("metrics", {}), after)
+        return record
+
+    async def start_chrome_trace(self, browser: Browser, page: Optional[Page]) -> Optional[str]:
+        """
+        Start the armed Chrome trace, if any, and disarm it.
+        """
+        path, self.chrome_trace_path = self.chrome_trace_path, None
+        if path is None:
+            return None
+        await browser.start_tracing(page=page, path=path, screenshots=False)
+        return path
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self.out_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.out_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=True, separators=(",", ":")) + "\n")
+
+
+def compact_args(args: Dict[str, Any], limit: int = 80) -> Dict[str, Any]:
+    out = {}
+    for key, value in args.items():
+        if isinstance(value, str) and len(value) > limit:
+            value = value[:limit] + "..."
+        elif not isinstance(value, (str, int, float, bool)) and value is not None:
+            continue
+        out[key] = value
+    return out
+
+
+def new_record(tool: str, args: Dict[str, Any]) -> Dict[str, Any]:
+    return {"ts": round(time.time(), 3), "tool": tool, "args": compact_args(args)}
+
+
+def _stats(values: List[float]) -> Dict[str, Any]:
+    return {
+        "n": len(values),
+        "p50": round(statistics.median(values)),
+        "max": round(max(values)),
+    }
+
+
+def summarize_trace(path: Path, top: int = 10) -> Dict[str, Any]:
+    """
+    Group per-call records by tool@host and by selector, slowest first.
+    """
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+
+    by_site: Dict[str, List[Dict[str, Any]]] = {}
+    by_selector: Dict[str, List[Dict[str, Any]]] = {}
+    for rec in records:
+        host = urlparse(rec.get("url") or "").hostname or "-"
+        by_site.setdefault(f"{rec['tool']}@{host}", []).append(rec)
+        selector = rec.get("args", {}).get("selector")
+        if selector:
+            by_selector.setdefault(selector, []).append(rec)
+
+    def group(recs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        out = _stats([r["ms"] for r in recs])
+        out["errors"] = sum(1 for r in recs if not r.get("ok", True))
+        cdp = [r["cdp"] for r in recs if "cdp" in r and r["cdp"].get("scope", "call") == "call"]
+        if cdp:
+            for name in ("ScriptDuration", "LayoutDuration", "RecalcStyleDuration"):
+                out[name] = round(sum(c.get(name, 0) for c in cdp) / len(cdp))
+        tasks = [r["longtasks"]["total"] for r in recs if "longtasks" in r]
+        if tasks:
+            out["longtask_ms"] = round(sum(tasks) / len(tasks))
+        ttfb = [r["nav"]["ttfb"] for r in recs if "nav" in r]
+        if ttfb:
+            out["ttfb"] = round(statistics.median(ttfb))
+        return out
+
+    def ranked(groups: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        rows = [dict(key=key, **group(recs)) for key, recs in groups.items()]
+        rows.sort(key=lambda row: row["p50"], reverse=True)
+        return rows[:top]
+
+    slowest = sorted(records, key=lambda r: r["ms"], reverse=True)[:top]
+    return {
+        "calls": len(records),
+        "by_site": ranked(by_site),
+        "by_selector": ranked(by_selector),
+        "slowest": [
+            {"tool": r["tool"], "args": r.get("args", {}), "ms": r["ms"], "url": r.get("url")}
+            for r in slowest
+        ],
+    }
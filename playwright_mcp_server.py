@@ -1,12 +1,18 @@
+import asyncio
+import functools
 import random
 import sys
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional
 import os
 import json
 
-from mcp.server.fastmcp import FastMCP
-from playwright.async_api import Browser, BrowserContext, Page, async_playwright
+from mcp.server.fastmcp import Context, FastMCP
+from playwright.async_api import Browser, BrowserContext, ElementHandle, Page, async_playwright
+
+from perf_trace import PerfTracer, new_record, summarize_trace
+from sites import rank_search_results, search_sites
 
 mcp = FastMCP("playwright-mcp")
 
@@ -29,9 +35,40 @@ class BrowserState:
             "Chrome/121.0.0.0 Safari/537.36"
         )
         self._page_listener_attached = False
+        self.ref_indexes: Dict[Page, "RefIndex"] = {}
+
+
+class RefIndex:
+    """
+    Snapshot refs (e1@3, e2@3, ...: element number @ generation) mapped to element
+    handles for one page. Cleared by a new snapshot or a main-frame navigation,
+    each of which bumps the generation, so refs from older snapshots are rejected.
+    """
+
+    def __init__(self) -> None:
+        self.generation = 0
+        self.handles: Dict[str, ElementHandle] = {}
+
+    def invalidate(self) -> None:
+        self.generation += 1
+        self.handles = {}
+
+    def add(self, element: ElementHandle) -> str:
+        ref = f"e{len(self.handles) + 1}@{self.generation}"
+        self.handles[ref] = element
+        return ref
+
+    def resolve(self, ref: str) -> ElementHandle:
+        handle = self.handles.get(ref)
+        if handle is not None:
+            return handle
+        if ref.partition("@")[2] != str(self.generation):
+            raise ValueError(f"stale ref {ref}; page is at generation {self.generation}, take a new snapshot")
+        raise ValueError(f"unknown ref {ref}")
 
 
 state = BrowserState()
+tracer = PerfTracer()
 
 
 async def ensure_page() -> Page:
@@ -94,6 +131,157 @@ async def switch_to_latest_page() -> Page:
     return state.page
 
 
+async def open_extra_page(foreground: Page) -> Page:
+    """
+    Open another page in foreground's context and keep foreground as the active page.
+    In headed/CDP mode this is a real tab that shows up in front of the user. Restoring
+    state.page works because the context "page" event fires before new_page() returns.
+    """
+    page = await foreground.context.new_page()
+    state.page = foreground
+    return page
+
+
+def current_browser() -> Optional[Browser]:
+    if state.browser is not None:
+        return state.browser
+    if state.context is not None:
+        return state.context.browser
+    return None
+
+
+def traced(fn):
+    """
+    Record page performance around a tool call when tracing is enabled,
+    and wrap the call in a Chrome trace when one is armed.
+    """
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        if not tracer.enabled and tracer.chrome_trace_path is None:
+            return await fn(*args, **kwargs)
+
+        record = new_record(fn.__name__, kwargs)
+        chrome_trace = None
+        if tracer.chrome_trace_path is not None:
+            # The browser may not be up yet when the trace was armed.
+            await ensure_page()
+            browser = current_browser()
+            if browser is None:
+                tracer.chrome_trace_path = None
+                record["trace_error"] = "no browser to trace in persistent-context mode"
+            else:
+                try:
+                    chrome_trace = await tracer.start_chrome_trace(browser, state.page)
+                except Exception as exc:
+                    record["trace_error"] = str(exc)[:200]
+        if tracer.enabled:
+            # Performance must be enabled on the page before the call, or the
+            # counters only start once it is over.
+            await ensure_page()
+        page = state.page
+        snapshot = await tracer.before(page) if tracer.enabled else {}
+        started = time.monotonic()
+        try:
+            result = await fn(*args, **kwargs)
+            record["ok"] = True
+            return result
+        except Exception as exc:
+            record["ok"] = False
+            record["error"] = str(exc)[:200]
+            raise
+        finally:
+            record["ms"] = round((time.monotonic() - started) * 1000)
+            if chrome_trace:
+                try:
+                    await current_browser().stop_tracing()
+                    record["trace"] = chrome_trace
+                except Exception as exc:
+                    record["trace_error"] = str(exc)[:200]
+            if tracer.enabled:
+                after_page = state.page
+                record.update(await tracer.after(after_page, snapshot if after_page is page else {}))
+            tracer.write(record)
+
+    return wrapper
+
+
+def ref_index(page: Page) -> RefIndex:
+    index = state.ref_indexes.get(page)
+    if index is None:
+        index = RefIndex()
+        state.ref_indexes[page] = index
+
+        def _on_navigated(frame) -> None:
+            if frame == page.main_frame:
+                index.invalidate()
+
+        page.on("framenavigated", _on_navigated)
+        page.on("close", lambda _: state.ref_indexes.pop(page, None))
+    return index
+
+
+async def _action_target(page: Page, selector: str, ref: str) -> tuple:
+    """
+    Return (handle, label) for a ref, or (None, selector) to fall back to selector lookup.
+    """
+    if ref:
+        index = state.ref_indexes.get(page)
+        if index is None:
+            raise ValueError(f"unknown ref {ref}; take a snapshot first")
+        return index.resolve(ref), ref
+    if not selector:
+        raise ValueError("selector or ref is required")
+    return None, selector
+
+
+SEARCH_RESULTS_SCRIPT = """
+  ({selectors, maxItems}) => {
+    const pick = (root, sel) => {
+      const el = root.querySelector(sel);
+      return el ? (el.innerText || el.textContent || "").trim() : "";
+    };
+    const items = Array.from(document.querySelectorAll(selectors.item)).slice(0, maxItems);
+    return items
+      .map((el) => {
+        const link = el.querySelector(selectors.link);
+        return {
+          title: pick(el, selectors.title),
+          price: pick(el, selectors.price),
+          url: link ? link.href : "",
+        };
+      })
+      .filter((item) => item.title);
+  }
+"""
+
+
+async def _search_site(
+    page: Page, name: str, site: Dict[str, Any], query: str, max_items: int
+) -> List[Dict[str, Any]]:
+    await page.goto(site["search_url"](query), wait_until="domcontentloaded")
+    await page.wait_for_selector(site["selectors"]["item"], state="attached")
+    items = await page.evaluate(
+        SEARCH_RESULTS_SCRIPT, {"selectors": site["selectors"], "maxItems": max_items}
+    )
+    for rank, item in enumerate(items, start=1):
+        item["site"] = name
+        item["rank"] = rank
+    return items
+
+
+async def _trace_site_page(
+    page: Page, name: str, query: str, status: Dict[str, Any], snapshot: Dict[str, Any]
+) -> None:
+    record = new_record("search_all_sites", {"query": query, "site": name})
+    record["ok"] = status["ok"]
+    record["ms"] = status["ms"]
+    if not status["ok"]:
+        record["error"] = status["error"][:200]
+    record.update(await tracer.after(page, snapshot))
+    tracer.write(record)
+
+
 @mcp.tool()
 async def start_browser(headless: bool = False) -> str:
     """
@@ -105,6 +293,7 @@ async def start_browser(headless: bool = False) -> str:
 
 
 @mcp.tool()
+@traced
 async def open_url(url: str) -> str:
     """
     Navigate to a URL.
@@ -116,36 +305,52 @@ async def open_url(url: str) -> str:
 
 
 @mcp.tool()
-async def click(selector: str) -> str:
+@traced
+async def click(selector: str = "", ref: str = "") -> str:
     """
-    Click an element by selector.
+    Click an element by selector or by snapshot ref.
     """
     page = await ensure_page()
-    await page.click(selector)
-    return f"clicked {selector}"
+    handle, target = await _action_target(page, selector, ref)
+    if handle is not None:
+        await handle.click()
+    else:
+        await page.click(selector)
+    return f"clicked {target}"
 
 
 @mcp.tool()
-async def fill(selector: str, text: str) -> str:
+@traced
+async def fill(text: str, selector: str = "", ref: str = "") -> str:
     """
-    Fill an input by selector.
+    Fill an input by selector or by snapshot ref.
     """
     page = await ensure_page()
-    await page.fill(selector, text)
-    return f"filled {selector}"
+    handle, target = await _action_target(page, selector, ref)
+    if handle is not None:
+        await handle.fill(text)
+    else:
+        await page.fill(selector, text)
+    return f"filled {target}"
 
 
 @mcp.tool()
-async def press(selector: str, key: str) -> str:
+@traced
+async def press(key: str, selector: str = "", ref: str = "") -> str:
     """
-    Press a key on a focused element.
+    Press a key on an element given by selector or snapshot ref.
     """
     page = await ensure_page()
-    await page.press(selector, key)
-    return f"pressed {key} on {selector}"
+    handle, target = await _action_target(page, selector, ref)
+    if handle is not None:
+        await handle.press(key)
+    else:
+        await page.press(selector, key)
+    return f"pressed {key} on {target}"
 
 
 @mcp.tool()
+@traced
 async def wait(ms: int) -> str:
     """
     Wait for a number of milliseconds.
@@ -156,6 +361,7 @@ async def wait(ms: int) -> str:
 
 
 @mcp.tool()
+@traced
 async def scroll(delta_y: int) -> str:
     """
     Scroll the page by delta_y pixels.
@@ -166,6 +372,7 @@ async def scroll(delta_y: int) -> str:
 
 
 @mcp.tool()
+@traced
 async def humanize(steps: int = 3, min_wait_ms: int = 200, max_wait_ms: int = 800, max_scroll: int = 800) -> str:
     """
     Perform small human-like actions: move mouse, scroll, and wait.
@@ -190,6 +397,7 @@ async def humanize(steps: int = 3, min_wait_ms: int = 200, max_wait_ms: int = 80
 
 
 @mcp.tool()
+@traced
 async def get_text(max_chars: int = 2000) -> str:
     """
     Return visible text from the page (truncated).
@@ -202,6 +410,7 @@ async def get_text(max_chars: int = 2000) -> str:
 
 
 @mcp.tool()
+@traced
 async def get_visible_buttons(max_items: int = 200) -> str:
     """
     Return visible button-like elements with class and label text, across frames.
@@ -254,6 +463,189 @@ async def get_visible_buttons(max_items: int = 200) -> str:
 
 
 @mcp.tool()
+async def search_all_sites(
+    query: str,
+    ctx: Context,
+    sites: str = "",
+    timeout_ms: int = 0,
+    max_items: int = 10,
+) -> str:
+    """
+    Search registered sites concurrently (one page each) and return merged, ranked results.
+    sites is a comma-separated subset (default: all); timeout_ms=0 uses each site's own deadline.
+    As each site finishes, its status and the current merged top max_items are sent as a
+    log notification.
+    """
+    registry = search_sites()
+    names = [n.strip() for n in sites.split(",") if n.strip()] or list(registry)
+    unknown = [n for n in names if n not in registry]
+    if unknown:
+        raise ValueError(f"unknown sites: {', '.join(unknown)}")
+
+    foreground = await ensure_page()
+
+    async def run(name: str) -> tuple:
+        site = registry[name]
+        deadline_ms = timeout_ms or site["timeout_ms"]
+        started = time.monotonic()
+        page: Optional[Page] = None
+        items: List[Dict[str, Any]] = []
+        status: Dict[str, Any] = {"ok": False, "error": "cancelled"}
+        snapshot: Dict[str, Any] = {}
+        try:
+            # Opening the tab is outside the deadline so a timeout can never orphan it.
+            page = await open_extra_page(foreground)
+            if tracer.enabled:
+                snapshot = await tracer.before(page)
+            items = await asyncio.wait_for(
+                _search_site(page, name, site, query, max_items), deadline_ms / 1000
+            )
+            status = {"ok": True, "count": len(items)}
+        except asyncio.TimeoutError:
+            status = {"ok": False, "error": f"timeout after {deadline_ms}ms"}
+        except Exception as exc:
+            status = {"ok": False, "error": str(exc)}
+        finally:
+            status["ms"] = int((time.monotonic() - started) * 1000)
+            if page is not None:
+                try:
+                    if tracer.enabled:
+                        await _trace_site_page(page, name, query, status, snapshot)
+                except Exception:
+                    pass
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+        return name, items, status
+
+    merged: List[Dict[str, Any]] = []
+    statuses: Dict[str, Dict[str, Any]] = {}
+    try:
+        for done, future in enumerate(asyncio.as_completed([run(n) for n in names]), start=1):
+            name, items, status = await future
+            statuses[name] = status
+            merged = rank_search_results(query, merged + items)
+            await ctx.report_progress(done, len(names), message=f"{name} finished")
+            update = {"site": name, "status": status, "results": merged[:max_items]}
+            await ctx.info(json.dumps(update, ensure_ascii=True))
+    finally:
+        state.page = foreground
+
+    return json.dumps({"query": query, "sites": statuses, "results": merged}, ensure_ascii=True)
+
+
+SNAPSHOT_SCRIPT = """
+  (maxItems) => {
+    const selectors = [
+      "a[href]",
+      "button",
+      "input:not([type='hidden'])",
+      "textarea",
+      "select",
+      "[role='button']",
+      "[role='link']",
+      "[role='textbox']",
+      "[role='checkbox']",
+      "[contenteditable='true']",
+    ];
+    const roleOf = (el) => {
+      const role = el.getAttribute("role");
+      if (role) return role;
+      const tag = el.tagName.toLowerCase();
+      if (tag === "a") return "link";
+      if (tag === "textarea") return "textbox";
+      if (tag !== "input") return tag;
+      const type = (el.type || "text").toLowerCase();
+      if (["button", "submit", "reset", "image"].includes(type)) return "button";
+      if (type === "checkbox" || type === "radio") return type;
+      return "textbox";
+    };
+    const els = [];
+    const info = [];
+    for (const el of document.querySelectorAll(selectors.join(","))) {
+      if (els.length >= maxItems) break;
+      if (el.disabled) continue;
+      const rect = el.getBoundingClientRect();
+      if (!rect || rect.width === 0 || rect.height === 0) continue;
+      const style = window.getComputedStyle(el);
+      if (style.display === "none" || style.visibility === "hidden" || style.opacity === "0") continue;
+      const role = roleOf(el);
+      const label =
+        el.getAttribute("aria-label") ||
+        (role === "textbox" ? el.placeholder || el.name : el.innerText || el.value) ||
+        el.title ||
+        "";
+      els.push(el);
+      info.push({ role, name: label.trim().replace(/\\s+/g, " ").slice(0, 80) });
+    }
+    return { els, info };
+  }
+"""
+
+
+@mcp.tool()
+@traced
+async def snapshot(max_items: int = 200) -> str:
+    """
+    List visible interactive elements across frames as numbered refs (e1, e2, ...).
+    Pass a ref to click/fill/press to act on the element without a selector.
+    """
+    page = await ensure_page()
+    index = ref_index(page)
+    old_handles = list(index.handles.values())
+    index.invalidate()
+    for old in old_handles:
+        try:
+            await old.dispose()
+        except Exception:
+            pass
+
+    lines = [f"generation={index.generation} url={page.url}"]
+    remaining = max_items
+    for frame_no, frame in enumerate(page.frames):
+        if remaining <= 0:
+            break
+        # Everything except the element handles stored in the index is released.
+        temporary = []
+        elements: Dict[str, Any] = {}
+        kept = set()
+        try:
+            result = await frame.evaluate_handle(SNAPSHOT_SCRIPT, remaining)
+            temporary.append(result)
+            info_handle = await result.get_property("info")
+            temporary.append(info_handle)
+            els_handle = await result.get_property("els")
+            temporary.append(els_handle)
+            info = await info_handle.json_value()
+            elements = await els_handle.get_properties()
+            for i, item in enumerate(info):
+                handle = elements.get(str(i))
+                element = handle.as_element() if handle is not None else None
+                if element is None:
+                    continue
+                ref = index.add(element)
+                kept.add(str(i))
+                line = f"{ref} {item['role']} {json.dumps(item['name'], ensure_ascii=True)}"
+                if frame_no:
+                    line += f" frame={frame_no}"
+                lines.append(line)
+                remaining -= 1
+        except Exception:
+            continue
+        finally:
+            temporary.extend(h for key, h in elements.items() if key not in kept)
+            for handle in temporary:
+                try:
+                    await handle.dispose()
+                except Exception:
+                    pass
+
+    return "\n".join(lines)
+
+
+@mcp.tool()
+@traced
 async def screenshot(path: str, full_page: bool = True) -> str:
     """
     Take a screenshot to a local path.
@@ -263,6 +655,47 @@ async def screenshot(path: str, full_page: bool = True) -> str:
     return f"screenshot {path}"
 
 
+@mcp.tool()
+async def set_tracing(enabled: bool = True, path: str = "") -> str:
+    """
+    Turn per-call page performance tracing on or off; records are appended as JSON lines
+    to path (default perf_trace.jsonl, or the last path given).
+    Turning it off detaches the CDP sessions; the long-task init script stays registered
+    on the browser context until it is closed (Playwright cannot remove init scripts).
+    """
+    tracer.enabled = enabled
+    if path:
+        tracer.out_path = Path(path)
+    if enabled and state.page is not None:
+        await tracer.install(state.page)
+    if not enabled:
+        await tracer.detach()
+    return f"tracing enabled={enabled} path={tracer.out_path}"
+
+
+@mcp.tool()
+async def trace_next_call(path: str = "chrome_trace.json") -> str:
+    """
+    Capture a full Chrome trace (DevTools format) for the next traced tool call only.
+    Needs a real browser (CDP mode); persistent-context mode has none.
+    """
+    if state.context is not None and current_browser() is None:
+        raise ValueError("chrome trace needs a browser; not available in persistent-context mode")
+    tracer.chrome_trace_path = path
+    return f"chrome_trace armed path={path}"
+
+
+@mcp.tool()
+async def trace_summary(path: str = "", top: int = 10) -> str:
+    """
+    Summarize recorded calls by tool/site and selector, slowest first.
+    """
+    trace_path = Path(path) if path else tracer.out_path
+    if not trace_path.exists():
+        raise ValueError(f"no trace file at {trace_path}")
+    return json.dumps(summarize_trace(trace_path, top), ensure_ascii=True)
+
+
 @mcp.tool()
 async def close_browser() -> str:
     """
@@ -276,6 +709,7 @@ async def close_browser() -> str:
         await state.context.close()
         state.context = None
     state._page_listener_attached = False
+    state.ref_indexes.clear()
 
 
 @mcp.tool()
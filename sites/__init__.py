@@ -1,10 +1,63 @@
-from .naver import naver_shopping_search_url, is_naver_shopping
-from .coupang import coupang_logout_commands, coupang_selectors, coupang_urls
+from __future__ import annotations
+
+from typing import Any
+
+from .naver import NAVER_SEARCH_TIMEOUT_MS, naver_result_selectors, naver_shopping_search_url, is_naver_shopping
+from .coupang import (
+    COUPANG_SEARCH_TIMEOUT_MS,
+    coupang_logout_commands,
+    coupang_result_selectors,
+    coupang_search_url,
+    coupang_selectors,
+    coupang_urls,
+)
+
+
+def search_sites() -> dict[str, dict[str, Any]]:
+    """
+    Registry of sites that can be searched directly by URL.
+
+    Each entry has a search_url(query) builder, result selectors
+    (item/title/price/link) and a default per-site timeout in ms.
+    """
+    return {
+        "coupang": {
+            "search_url": coupang_search_url,
+            "selectors": coupang_result_selectors(),
+            "timeout_ms": COUPANG_SEARCH_TIMEOUT_MS,
+        },
+        "naver": {
+            "search_url": naver_shopping_search_url,
+            "selectors": naver_result_selectors(),
+            "timeout_ms": NAVER_SEARCH_TIMEOUT_MS,
+        },
+    }
+
+
+def rank_search_results(query: str, items: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Merge results from several sites: more query terms in the title first,
+    then interleave sites by their own rank.
+    """
+    terms = [t.lower() for t in query.split() if t]
+
+    def key(item: dict[str, Any]) -> tuple:
+        title = item["title"].lower()
+        matched = sum(1 for t in terms if t in title)
+        return (-matched, item["rank"], item["site"])
+
+    return sorted(items, key=key)
+
 
 __all__ = [
     "is_naver_shopping",
     "naver_shopping_search_url",
+    "naver_result_selectors",
     "coupang_urls",
     "coupang_selectors",
+    "coupang_search_url",
+    "coupang_result_selectors",
     "coupang_logout_commands",
+    "search_sites",
+    "rank_search_results",
 ]
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from urllib.parse import quote
+
 
 COUPANG_HOME_URL = "https://www.coupang.com/"
 COUPANG_LOGIN_URL = (
@@ -7,6 +9,7 @@ COUPANG_LOGIN_URL = (
     "rtnUrl=https%3A%2F%2Fwww.coupang.com%2Fnp%2Fpost%2Flogin%3Fr%3D"
     "http%253A%252F%252Fwww.coupang.com%252F"
 )
+COUPANG_SEARCH_TIMEOUT_MS = 15000
 
 
 SELECTORS = {
@@ -16,6 +19,13 @@ SELECTORS = {
     "search_input": 'input[name="q"]',
 }
 
+RESULT_SELECTORS = {
+    "item": 'li[class*="ProductUnit_productUnit"], li.search-product',
+    "title": '[class*="productName"], .name',
+    "price": '[class*="Price_priceValue"], .price-value',
+    "link": "a[href]",
+}
+
 
 def coupang_urls() -> dict[str, str]:
     return {"home": COUPANG_HOME_URL, "login": COUPANG_LOGIN_URL}
@@ -25,6 +35,15 @@ def coupang_selectors() -> dict[str, str]:
     return dict(SELECTORS)
 
 
+def coupang_search_url(query: str) -> str:
+    q = query.strip()
+    return f"https://www.coupang.com/np/search?q={quote(q)}&channel=user"
+
+
+def coupang_result_selectors() -> dict[str, str]:
+    return dict(RESULT_SELECTORS)
+
+
 def coupang_logout_commands() -> list[tuple[str, dict[str, str]]]:
     selectors = coupang_selectors()
     return [("start_browser", {"headless": False}), ("click", {"selector": selectors["logout_button"]})]
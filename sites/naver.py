@@ -3,10 +3,24 @@ from __future__ import annotations
 from urllib.parse import quote
 
 
+NAVER_SEARCH_TIMEOUT_MS = 10000
+
+RESULT_SELECTORS = {
+    "item": '[class*="basicProductCard_basic_product_card"], [class*="product_item"]',
+    "title": '[class*="productCardTitle"], [class*="product_title"]',
+    "price": '[class*="priceTag_number"], [class*="price_num"]',
+    "link": "a[href]",
+}
+
+
 def naver_shopping_search_url(query: str) -> str:
     q = query.strip()
     return f"https://search.shopping.naver.com/ns/search?query={quote(q)}"
 
 
+def naver_result_selectors() -> dict[str, str]:
+    return dict(RESULT_SELECTORS)
+
+
 def is_naver_shopping(url: str) -> bool:
     return "shopping.naver.com" in url or "search.shopping.naver.com" in url
@@ -0,0 +1,45 @@
+import pytest
+
+pytest.importorskip("mcp")
+pytest.importorskip("httpx")
+
+from cli import parse_command, rule_based_commands
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "쿠팡이랑 네이버에서 생수 검색해줘",
+        "생수 쿠팡이랑 네이버에서 검색해줘",
+        "네이버 쇼핑과 쿠팡에 생수 검색",
+        "생수   쿠팡, 네이버에 검색해",
+    ],
+)
+def test_multi_site_query_extraction(text):
+    assert rule_based_commands(text)[-1] == ("search_all_sites", {"query": "생수"})
+
+
+def test_multi_site_query_keeps_multiple_words():
+    assert rule_based_commands("쿠팡하고 네이버에서 무선 이어폰 검색")[-1] == (
+        "search_all_sites",
+        {"query": "무선 이어폰"},
+    )
+
+
+def test_multi_command():
+    assert parse_command("multi 생수 2L") == ("search_all_sites", {"query": "생수 2L"})
+
+
+def test_trace_commands():
+    assert parse_command("trace") == ("set_tracing", {"enabled": True})
+    assert parse_command("trace off") == ("set_tracing", {"enabled": False})
+    assert parse_command("trace chrome") == ("trace_next_call", {})
+    assert parse_command("trace chrome out.json") == ("trace_next_call", {"path": "out.json"})
+    assert parse_command("tracesum 3") == ("trace_summary", {"top": 3})
+
+
+def test_ref_targets():
+    assert parse_command("click @e2@3") == ("click", {"ref": "e2@3"})
+    assert parse_command("fill @e1@3 생수 2L") == ("fill", {"ref": "e1@3", "text": "생수 2L"})
+    assert parse_command("press @e1@3 Enter") == ("press", {"ref": "e1@3", "key": "Enter"})
+    assert parse_command("click .headerSearchBtn") == ("click", {"selector": ".headerSearchBtn"})
@@ -0,0 +1,60 @@
+import json
+
+from perf_trace import cdp_metrics, compact_args, new_record, summarize_trace
+
+
+def test_compact_args_truncates_and_drops_non_scalars():
+    args = compact_args({"selector": "x" * 100, "ms": 5, "ctx": object(), "ref": None}, limit=10)
+    assert args == {"selector": "x" * 10 + "...", "ms": 5, "ref": None}
+
+
+def test_cdp_metrics_delta_across_same_renderer():
+    before = {"ScriptDuration": 1.0, "LayoutDuration": 0.5, "LayoutCount": 10, "Nodes": 100}
+    after = {"ScriptDuration": 1.25, "LayoutDuration": 0.5, "LayoutCount": 12, "Nodes": 300}
+    cdp = cdp_metrics(before, after)
+    assert cdp["scope"] == "call"
+    assert cdp["ScriptDuration"] == 250
+    assert cdp["LayoutCount"] == 2
+    assert cdp["Nodes"] == 300
+
+
+def test_cdp_metrics_absolute_when_counter_goes_backwards():
+    cdp = cdp_metrics({"ScriptDuration": 2.0}, {"ScriptDuration": 0.1})
+    assert cdp["scope"] == "absolute"
+    assert cdp["ScriptDuration"] == 100
+
+
+def test_cdp_metrics_absolute_without_before():
+    assert cdp_metrics({}, {"TaskDuration": 0.2})["scope"] == "absolute"
+
+
+def _write(path, records):
+    path.write_text("".join(json.dumps(r) + "\n" for r in records) + "not json\n")
+
+
+def test_summarize_trace_groups_by_site_and_selector(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    _write(
+        path,
+        [
+            dict(new_record("click", {"selector": "#buy"}), ok=True, ms=100, url="https://a.com/x",
+                 cdp={"scope": "call", "ScriptDuration": 40}),
+            dict(new_record("click", {"selector": "#buy"}), ok=False, ms=300, url="https://a.com/y",
+                 cdp={"scope": "absolute", "ScriptDuration": 9000}),
+            dict(new_record("open_url", {"url": "https://b.com"}), ok=True, ms=900, url="https://b.com/",
+                 nav={"ttfb": 120}, longtasks={"count": 1, "total": 80, "max": 80}),
+        ],
+    )
+    summary = summarize_trace(path, top=5)
+    assert summary["calls"] == 3
+    assert [row["key"] for row in summary["by_site"]] == ["open_url@b.com", "click@a.com"]
+
+    click = summary["by_site"][1]
+    assert click["n"] == 2 and click["errors"] == 1 and click["max"] == 300
+    # Absolute CDP values are left out of the averages.
+    assert click["ScriptDuration"] == 40
+
+    opened = summary["by_site"][0]
+    assert opened["ttfb"] == 120 and opened["longtask_ms"] == 80
+    assert summary["by_selector"][0]["key"] == "#buy"
+    assert summary["slowest"][0]["tool"] == "open_url"
@@ -0,0 +1,28 @@
+import pytest
+
+pytest.importorskip("mcp")
+pytest.importorskip("playwright")
+
+from playwright_mcp_server import RefIndex
+
+
+def test_refs_carry_generation():
+    index = RefIndex()
+    index.invalidate()
+    first = object()
+    assert index.add(first) == "e1@1"
+    assert index.resolve("e1@1") is first
+
+
+def test_old_generation_ref_is_stale():
+    index = RefIndex()
+    index.invalidate()
+    index.add(object())
+    index.invalidate()
+    index.add(object())
+    with pytest.raises(ValueError, match="stale ref e1@1"):
+        index.resolve("e1@1")
+    with pytest.raises(ValueError, match="stale ref e1"):
+        index.resolve("e1")
+    with pytest.raises(ValueError, match="unknown ref e9@2"):
+        index.resolve("e9@2")
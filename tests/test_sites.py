@@ -0,0 +1,45 @@
+from sites import coupang_search_url, naver_shopping_search_url, rank_search_results, search_sites
+
+
+def test_search_sites_registry_shape():
+    registry = search_sites()
+    assert set(registry) == {"coupang", "naver"}
+    for site in registry.values():
+        assert callable(site["search_url"])
+        assert set(site["selectors"]) == {"item", "title", "price", "link"}
+        assert site["timeout_ms"] > 0
+
+
+def test_search_urls_quote_query():
+    assert coupang_search_url(" 생수 2L ").startswith("https://www.coupang.com/np/search?q=%EC%83%9D%EC%88%98%202L")
+    assert naver_shopping_search_url("a b").endswith("query=a%20b")
+
+
+def _item(site, rank, title):
+    return {"site": site, "rank": rank, "title": title}
+
+
+def test_rank_search_results_prefers_matching_titles():
+    items = [
+        _item("coupang", 1, "Sparkling water"),
+        _item("naver", 1, "Water bottle 2L"),
+        _item("coupang", 2, "Bottled water 2L"),
+    ]
+    ranked = rank_search_results("water 2L", items)
+    assert [(i["site"], i["rank"]) for i in ranked] == [("naver", 1), ("coupang", 2), ("coupang", 1)]
+
+
+def test_rank_search_results_interleaves_sites_by_rank():
+    items = [
+        _item("coupang", 1, "a"),
+        _item("coupang", 2, "b"),
+        _item("naver", 1, "c"),
+        _item("naver", 2, "d"),
+    ]
+    ranked = rank_search_results("zzz", items)
+    assert [(i["site"], i["rank"]) for i in ranked] == [
+        ("coupang", 1),
+        ("naver", 1),
+        ("coupang", 2),
+        ("naver", 2),
+    ]